@@ -2,8 +2,6 @@
 Validator for Word document XML files against XSD schemas.
 """
 
-import re
-import tempfile
 import zipfile
 
 import lxml.etree
@@ -11,16 +9,39 @@ import lxml.etree
 from .base import BaseSchemaValidator
 
 
+def _release(elem):
+    """Free a fully processed iterparse element and its preceding siblings.
+
+    Keeps memory flat while streaming large documents ("fast_iter" pattern).
+    """
+    elem.clear()
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
+
+
 class DOCXSchemaValidator(BaseSchemaValidator):
     """Validator for Word document XML files against XSD schemas."""
 
     # Word-specific namespace
     WORD_2006_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
 
+    # Clark-notation tags used while walking document.xml
+    _W_T = f"{{{WORD_2006_NAMESPACE}}}t"
+    _W_P = f"{{{WORD_2006_NAMESPACE}}}p"
+    _W_DEL = f"{{{WORD_2006_NAMESPACE}}}del"
+    _W_INS = f"{{{WORD_2006_NAMESPACE}}}ins"
+    _W_DEL_TEXT = f"{{{WORD_2006_NAMESPACE}}}delText"
+    _XML_SPACE = f"{{{BaseSchemaValidator.XML_NAMESPACE}}}space"
+
     # Word-specific element to relationship type mappings
     # Start with empty mapping - add specific cases as we discover them
     ELEMENT_RELATIONSHIP_TYPES = {}
 
+    def __init__(self, unpacked_dir, original_file, verbose=False):
+        super().__init__(unpacked_dir, original_file, verbose=verbose)
+        # document.xml path -> results of _analyze_document()
+        self._document_analyses = {}
+
     def validate(self):
         """Run all validation checks and return True if all pass."""
         # Test 0: XML well-formedness
@@ -80,35 +101,21 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             if xml_file.name != "document.xml":
                 continue
 
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+            analysis = self._analyze_document(xml_file)
+            if analysis["error"]:
+                errors.append(
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {analysis['error']}"
+                )
+                continue
 
-                # Find all w:t elements
-                for elem in root.iter(f"{{{self.WORD_2006_NAMESPACE}}}t"):
-                    if elem.text:
-                        text = elem.text
-                        # Check if text starts or ends with whitespace
-                        if re.match(r"^\s.*", text) or re.match(r".*\s$", text):
-                            # Check if xml:space="preserve" attribute exists
-                            xml_space_attr = f"{{{self.XML_NAMESPACE}}}space"
-                            if (
-                                xml_space_attr not in elem.attrib
-                                or elem.attrib[xml_space_attr] != "preserve"
-                            ):
-                                # Show a preview of the text
-                                text_preview = (
-                                    repr(text)[:50] + "..."
-                                    if len(repr(text)) > 50
-                                    else repr(text)
-                                )
-                                errors.append(
-                                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                    f"Line {elem.sourceline}: w:t element with whitespace missing xml:space='preserve': {text_preview}"
-                                )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
+            for sourceline, text in analysis["whitespace"]:
+                # Show a preview of the text
+                text_preview = (
+                    repr(text)[:50] + "..." if len(repr(text)) > 50 else repr(text)
+                )
                 errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                    f"Line {sourceline}: w:t element with whitespace missing xml:space='preserve': {text_preview}"
                 )
 
         if errors:
@@ -133,31 +140,21 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             if xml_file.name != "document.xml":
                 continue
 
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+            analysis = self._analyze_document(xml_file)
+            if analysis["error"]:
+                errors.append(
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {analysis['error']}"
+                )
+                continue
 
-                # Find all w:t elements that are descendants of w:del elements
-                namespaces = {"w": self.WORD_2006_NAMESPACE}
-                xpath_expression = ".//w:del//w:t"
-                problematic_t_elements = root.xpath(
-                    xpath_expression, namespaces=namespaces
+            for sourceline, text in analysis["deletions"]:
+                # Show a preview of the text
+                text_preview = (
+                    repr(text)[:50] + "..." if len(repr(text)) > 50 else repr(text)
                 )
-                for t_elem in problematic_t_elements:
-                    if t_elem.text:
-                        # Show a preview of the text
-                        text_preview = (
-                            repr(t_elem.text)[:50] + "..."
-                            if len(repr(t_elem.text)) > 50
-                            else repr(t_elem.text)
-                        )
-                        errors.append(
-                            f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                            f"Line {t_elem.sourceline}: <w:t> found within <w:del>: {text_preview}"
-                        )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
                 errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                    f"Line {sourceline}: <w:t> found within <w:del>: {text_preview}"
                 )
 
         if errors:
@@ -179,13 +176,13 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             if xml_file.name != "document.xml":
                 continue
 
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                # Count all w:p elements
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
-            except Exception as e:
-                print(f"Error counting paragraphs in unpacked document: {e}")
+            analysis = self._analyze_document(xml_file)
+            if analysis["error"]:
+                print(
+                    f"Error counting paragraphs in unpacked document: {analysis['error']}"
+                )
+            else:
+                count = analysis["paragraphs"]
 
         return count
 
@@ -194,22 +191,18 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         count = 0
 
         try:
-            # Create temporary directory to unpack original
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Unpack original docx
-                with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                    zip_ref.extractall(temp_dir)
-
-                # Parse document.xml
-                doc_xml_path = temp_dir + "/word/document.xml"
-                root = lxml.etree.parse(doc_xml_path).getroot()
-
-                # Count all w:p elements
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
+            # Stream document.xml straight out of the archive rather than
+            # extracting every part (media, fonts, ...) to disk first
+            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
+                with zip_ref.open("word/document.xml") as doc_xml:
+                    # Count all w:p elements, discarding each once seen
+                    for _, elem in lxml.etree.iterparse(doc_xml, tag=self._W_P):
+                        count += 1
+                        _release(elem)
 
         except Exception as e:
             print(f"Error counting paragraphs in original document: {e}")
+            count = 0
 
         return count
 
@@ -224,30 +217,20 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             if xml_file.name != "document.xml":
                 continue
 
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                namespaces = {"w": self.WORD_2006_NAMESPACE}
-
-                # Find w:delText in w:ins that are NOT within w:del
-                invalid_elements = root.xpath(
-                    ".//w:ins//w:delText[not(ancestor::w:del)]",
-                    namespaces=namespaces
+            analysis = self._analyze_document(xml_file)
+            if analysis["error"]:
+                errors.append(
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {analysis['error']}"
                 )
+                continue
 
-                for elem in invalid_elements:
-                    text_preview = (
-                        repr(elem.text or "")[:50] + "..."
-                        if len(repr(elem.text or "")) > 50
-                        else repr(elem.text or "")
-                    )
-                    errors.append(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Line {elem.sourceline}: <w:delText> within <w:ins>: {text_preview}"
-                    )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
+            for sourceline, text in analysis["insertions"]:
+                text_preview = (
+                    repr(text)[:50] + "..." if len(repr(text)) > 50 else repr(text)
+                )
                 errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                    f"Line {sourceline}: <w:delText> within <w:ins>: {text_preview}"
                 )
 
         if errors:
@@ -260,6 +243,80 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - No w:delText elements within w:ins elements")
             return True
 
+    def _analyze_document(self, xml_file):
+        """Run the document.xml content checks in a single streaming pass.
+
+        Whitespace preservation, w:t within w:del, w:delText within w:ins and
+        the paragraph count all only need one walk over the document, so they
+        share one parse instead of each re-reading the file. Results are
+        cached per file and are (sourceline, text) pairs for each violation.
+        """
+        if xml_file in self._document_analyses:
+            return self._document_analyses[xml_file]
+
+        # Local aliases keep attribute lookups out of the per-element loop
+        w_t, w_p = self._W_T, self._W_P
+        w_del, w_ins, w_del_text = self._W_DEL, self._W_INS, self._W_DEL_TEXT
+        xml_space = self._XML_SPACE
+
+        analysis = {
+            "whitespace": [],
+            "deletions": [],
+            "insertions": [],
+            "paragraphs": 0,
+            "error": None,
+        }
+        # Number of currently open w:del / w:ins ancestors
+        del_depth = 0
+        ins_depth = 0
+
+        try:
+            for event, elem in lxml.etree.iterparse(
+                str(xml_file), events=("start", "end")
+            ):
+                tag = elem.tag
+                if event == "start":
+                    if tag == w_del:
+                        del_depth += 1
+                    elif tag == w_ins:
+                        ins_depth += 1
+                    continue
+
+                if tag == w_t:
+                    text = elem.text
+                    if text:
+                        # Check if text starts or ends with whitespace
+                        if text[0].isspace() or text[-1].isspace():
+                            # Check if xml:space="preserve" attribute exists
+                            if elem.get(xml_space) != "preserve":
+                                analysis["whitespace"].append((elem.sourceline, text))
+                        if del_depth:
+                            analysis["deletions"].append((elem.sourceline, text))
+                elif tag == w_del_text:
+                    # w:delText is only allowed in w:ins if nested within a w:del
+                    if ins_depth and not del_depth:
+                        analysis["insertions"].append((elem.sourceline, elem.text or ""))
+                elif tag == w_p:
+                    analysis["paragraphs"] += 1
+                    # Everything inside the paragraph has been checked
+                    _release(elem)
+                elif tag == w_del:
+                    del_depth -= 1
+                elif tag == w_ins:
+                    ins_depth -= 1
+
+        except (lxml.etree.XMLSyntaxError, Exception) as e:
+            analysis = {
+                "whitespace": [],
+                "deletions": [],
+                "insertions": [],
+                "paragraphs": 0,
+                "error": e,
+            }
+
+        self._document_analyses[xml_file] = analysis
+        return analysis
+
     def compare_paragraph_counts(self):
         """Compare paragraph counts between original and new document."""
         original_count = self.count_paragraphs_in_original()
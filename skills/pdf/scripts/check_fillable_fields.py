@@ -6,7 +6,12 @@ from pypdf import PdfReader
 
 
 reader = PdfReader(sys.argv[1])
-if (reader.get_fields()):
+# Only look for a non-empty /AcroForm /Fields array; `get_fields()` would walk
+# and decode every field just to test whether there are any. `.get()` does not
+# resolve indirect references, so resolve both objects before testing them.
+acroform = reader.trailer["/Root"].get("/AcroForm")
+fields = acroform.get_object().get("/Fields") if acroform is not None else None
+if fields is not None and len(fields.get_object()):
     print("This PDF has fillable form fields")
 else:
     print("This PDF does not have fillable form fields; you will need to visually determine where to enter data")
@@ -1,29 +1,106 @@
+import itertools
 import os
 import sys
+import tempfile
 
 from pdf2image import convert_from_path
+from PIL import Image
+from pypdf import PdfReader
 
+try:
+    import pyvips
+except (ImportError, OSError):
+    # pyvips is optional; it also raises OSError when libvips itself is missing.
+    pyvips = None
 
-# Converts each page of a PDF to a PNG image.
 
+# Converts each page of a PDF to a JPEG (or PNG) image.
 
-def convert(pdf_path, output_dir, max_dim=1000):
-    images = convert_from_path(pdf_path, dpi=200)
 
-    for i, image in enumerate(images):
-        # Scale image if needed to keep width/height under `max_dim`
-        width, height = image.size
-        if width > max_dim or height > max_dim:
-            scale_factor = min(max_dim / width, max_dim / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height))
-        
-        image_path = os.path.join(output_dir, f"page_{i+1}.png")
-        image.save(image_path)
-        print(f"Saved page {i+1} as {image_path} (size: {image.size})")
+# Pages are shrunk to fit `max_dim`, but never rendered above this resolution.
+RENDER_DPI = 200
 
-    print(f"Converted {len(images)} pages to PNG images")
+
+def convert(pdf_path, output_dir, max_dim=1000, fmt="jpeg"):
+    ext = "jpg" if fmt in ("jpeg", "jpg") else fmt
+    page_count = None
+    if pyvips is not None:
+        try:
+            page_count = _convert_with_pyvips(pdf_path, output_dir, max_dim, ext)
+        except pyvips.Error:
+            # libvips can be built without a PDF loader (poppler or PDFium).
+            page_count = None
+    if page_count is None:
+        page_count = _convert_with_pdf2image(pdf_path, output_dir, max_dim, fmt, ext)
+    print(f"Converted {page_count} pages to {ext.upper()} images")
+
+
+def _convert_with_pyvips(pdf_path, output_dir, max_dim, ext):
+    # `thumbnail` renders each page directly at the scale needed to fit
+    # `max_dim` (shrink-on-load), so no full-resolution bitmap is built.
+    # Loading at RENDER_DPI with size="down" means pages that are already
+    # small enough stay at RENDER_DPI instead of being scaled up.
+    page_count = pyvips.Image.new_from_file(pdf_path).get("n-pages")
+    save_options = {"Q": 85} if ext == "jpg" else {}
+    for i in range(page_count):
+        page = pyvips.Image.thumbnail(
+            pdf_path,
+            max_dim,
+            height=max_dim,
+            size="down",
+            option_string=f"page={i},dpi={RENDER_DPI}",
+        )
+        if page.hasalpha():
+            page = page.flatten(background=255)
+        image_path = os.path.join(output_dir, f"page_{i+1}.{ext}")
+        page.write_to_file(image_path, **save_options)
+        print(f"Saved page {i+1} as {image_path} (size: ({page.width}, {page.height}))")
+    return page_count
+
+
+def _target_long_sides(pdf_path, max_dim):
+    # Long side of each page in pixels: its size at RENDER_DPI, capped at
+    # `max_dim`. Page boxes are read from the PDF without rendering anything.
+    sizes = []
+    for page in PdfReader(pdf_path).pages:
+        long_side_pts = max(page.mediabox.width, page.mediabox.height)
+        sizes.append(min(max_dim, int(float(long_side_pts) * RENDER_DPI / 72)))
+    return sizes
+
+
+def _convert_with_pdf2image(pdf_path, output_dir, max_dim, fmt, ext):
+    workers = os.cpu_count() or 1
+    paths = []
+    with tempfile.TemporaryDirectory(dir=output_dir) as render_dir:
+        # Have pdftoppm render straight to the target size and write the
+        # encoded pages to disk itself, so pixels never round-trip through
+        # Pillow. An integer `size` scales the longer side to that many pixels,
+        # preserving aspect ratio. It applies to a whole call, so consecutive
+        # pages that share a target size are rendered together (usually the
+        # whole document in one call).
+        sizes = enumerate(_target_long_sides(pdf_path, max_dim), start=1)
+        for size, run in itertools.groupby(sizes, key=lambda page: page[1]):
+            run = list(run)
+            paths += convert_from_path(
+                pdf_path,
+                size=size,
+                first_page=run[0][0],
+                last_page=run[-1][0],
+                thread_count=workers,
+                fmt=fmt,
+                jpegopt={"quality": 85, "progressive": False, "optimize": False},
+                output_folder=render_dir,
+                paths_only=True,
+            )
+
+        for i, path in enumerate(paths):
+            image_path = os.path.join(output_dir, f"page_{i+1}.{ext}")
+            os.replace(path, image_path)
+            # Opening only reads the header; the pixel data isn't decoded.
+            with Image.open(image_path) as image:
+                size = image.size
+            print(f"Saved page {i+1} as {image_path} (size: {size})")
+    return len(paths)
 
 
 if __name__ == "__main__":
@@ -19,6 +19,31 @@ def get_full_annotation_field_id(annotation):
     return ".".join(reversed(components)) if components else None
 
 
+# Returns a dict mapping the object number of every node in the AcroForm field
+# tree to its full field id (as returned by `get_full_annotation_field_id`).
+# Building this top-down in one pass avoids climbing the /Parent chain
+# separately for every widget annotation.
+def get_field_ids_by_object_number(reader: PdfReader):
+    field_ids = {}
+    acroform = reader.trailer["/Root"].get("/AcroForm", {})
+    stack = [(node, None) for node in acroform.get("/Fields", [])]
+    while stack:
+        node, parent_id = stack.pop()
+        idnum = getattr(node, "idnum", None)
+        if idnum is not None and idnum in field_ids:
+            continue  # Malformed PDFs can contain cycles
+        field_name = node.get('/T')
+        if field_name and parent_id:
+            field_id = f"{parent_id}.{field_name}"
+        else:
+            field_id = field_name or parent_id
+        if idnum is not None:
+            field_ids[idnum] = field_id
+        for kid in node.get('/Kids') or []:
+            stack.append((kid, field_id))
+    return field_ids
+
+
 def make_field_dict(field, field_id):
     field_dict = {"field_id": field_id}
     ft = field.get('/FT')
@@ -80,11 +105,20 @@ def get_field_info(reader: PdfReader):
     # all choices have the same field name.
     # See https://westhealth.github.io/exploring-fillable-forms-with-pdfrw.html
     radio_fields_by_id = {}
+    field_ids_by_object_number = get_field_ids_by_object_number(reader)
 
     for page_index, page in enumerate(reader.pages):
-        annotations = page.get('/Annots', [])
+        annotations = page.get('/Annots') or []
         for ann in annotations:
-            field_id = get_full_annotation_field_id(ann)
+            # Only widget annotations belong to form fields; skip links, comments, etc.
+            if ann.get('/Subtype') != '/Widget':
+                continue
+            idnum = getattr(ann, "idnum", None)
+            if idnum in field_ids_by_object_number:
+                field_id = field_ids_by_object_number[idnum]
+            else:
+                # Not reachable from /AcroForm /Fields; resolve it from the annotation.
+                field_id = get_full_annotation_field_id(ann)
             if field_id in field_info_by_id:
                 field_info_by_id[field_id]["page"] = page_index + 1
                 field_info_by_id[field_id]["rect"] = ann.get('/Rect')
@@ -123,13 +157,13 @@ def get_field_info(reader: PdfReader):
             print(f"Unable to determine location for field id: {field_info.get('field_id')}, ignoring")
 
     # Sort by page number, then Y position (flipped in PDF coordinate system), then X.
+    # `sort` computes each key once; a flat tuple is the cheapest key to build and compare.
     def sort_key(f):
         if "radio_options" in f:
             rect = f["radio_options"][0]["rect"] or [0, 0, 0, 0]
         else:
             rect = f.get("rect") or [0, 0, 0, 0]
-        adjusted_position = [-rect[1], rect[0]]
-        return [f.get("page"), adjusted_position]
+        return (f.get("page"), -rect[1], rect[0])
     
     sorted_fields = fields_with_location + list(radio_fields_by_id.values())
     sorted_fields.sort(key=sort_key)
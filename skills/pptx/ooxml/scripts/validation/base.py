@@ -2,12 +2,27 @@
 Base validator with common validation logic for document files.
 """
 
+import functools
+import os
 import re
 from pathlib import Path
 
 import lxml.etree
 
 
+@functools.lru_cache(maxsize=16)
+def _get_xsd(path, mtime):
+    """Parse and compile an XSD schema, cached per path and modification time.
+
+    Compiling the OOXML schemas is far more expensive than validating a file
+    against them, so compiled schemas are shared across files and validators.
+    """
+    with open(path, "rb") as xsd_file:
+        parser = lxml.etree.XMLParser()
+        xsd_doc = lxml.etree.parse(xsd_file, parser=parser, base_url=path)
+        return lxml.etree.XMLSchema(xsd_doc)
+
+
 class BaseSchemaValidator:
     """Base validator with common validation logic for document files."""
 
@@ -70,6 +85,11 @@ class BaseSchemaValidator:
     MC_NAMESPACE = "http://schemas.openxmlformats.org/markup-compatibility/2006"
     XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
 
+    # Compiled once and reused for every file checked by validate_unique_ids
+    _XP_ALTERNATE_CONTENT = lxml.etree.XPath(
+        ".//mc:AlternateContent", namespaces={"mc": MC_NAMESPACE}
+    )
+
     # Common OOXML namespaces used across validators
     PACKAGE_RELATIONSHIPS_NAMESPACE = (
         "http://schemas.openxmlformats.org/package/2006/relationships"
@@ -194,9 +214,7 @@ class BaseSchemaValidator:
                 file_ids = {}  # Track IDs that must be unique within this file
 
                 # Remove all mc:AlternateContent elements from the tree
-                mc_elements = root.xpath(
-                    ".//mc:AlternateContent", namespaces={"mc": self.MC_NAMESPACE}
-                )
+                mc_elements = self._XP_ALTERNATE_CONTENT(root)
                 for elem in mc_elements:
                     elem.getparent().remove(elem)
 
@@ -831,12 +849,7 @@ class BaseSchemaValidator:
 
         try:
             # Load schema
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            schema = _get_xsd(str(schema_path), os.path.getmtime(schema_path))
 
             # Load and preprocess XML
             with open(xml_file, "r") as f:
@@ -9,11 +9,13 @@ ALL text shapes identified by inventory.py will have their text cleared
 unless "paragraphs" is specified in the replacements for that shape.
 """
 
+import io
 import json
 import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
+import lxml.etree
 from inventory import InventoryData, extract_text_inventory
 from pptx import Presentation
 from pptx.dml.color import RGBColor
@@ -22,20 +24,29 @@ from pptx.enum.text import PP_ALIGN
 from pptx.oxml.xmlchemy import OxmlElement
 from pptx.util import Pt
 
+# Lookup tables for replacement JSON values, built once at import
+ALIGNMENT_MAP = {
+    "LEFT": PP_ALIGN.LEFT,
+    "CENTER": PP_ALIGN.CENTER,
+    "RIGHT": PP_ALIGN.RIGHT,
+    "JUSTIFY": PP_ALIGN.JUSTIFY,
+}
+THEME_COLORS = dict(MSO_THEME_COLOR.__members__)  # e.g. "DARK_1", "ACCENT_1"
+
+# Bullet-related children of <a:pPr>, selected in one compiled query
+BULLET_ELEMENTS_XPATH = lxml.etree.XPath(
+    "*[local-name()='buChar' or local-name()='buNone'"
+    " or local-name()='buAutoNum' or local-name()='buFont']"
+)
+
 
 def clear_paragraph_bullets(paragraph):
     """Clear bullet formatting from a paragraph."""
     pPr = paragraph._element.get_or_add_pPr()
 
     # Remove existing bullet elements
-    for child in list(pPr):
-        if (
-            child.tag.endswith("buChar")
-            or child.tag.endswith("buNone")
-            or child.tag.endswith("buAutoNum")
-            or child.tag.endswith("buFont")
-        ):
-            pPr.remove(child)
+    for child in BULLET_ELEMENTS_XPATH(pPr):
+        pPr.remove(child)
 
     return pPr
 
@@ -81,14 +92,9 @@ def apply_paragraph_properties(paragraph, para_data: Dict[str, Any]):
 
     # Apply alignment
     if "alignment" in para_data:
-        alignment_map = {
-            "LEFT": PP_ALIGN.LEFT,
-            "CENTER": PP_ALIGN.CENTER,
-            "RIGHT": PP_ALIGN.RIGHT,
-            "JUSTIFY": PP_ALIGN.JUSTIFY,
-        }
-        if para_data["alignment"] in alignment_map:
-            paragraph.alignment = alignment_map[para_data["alignment"]]
+        alignment = ALIGNMENT_MAP.get(para_data["alignment"])
+        if alignment is not None:
+            paragraph.alignment = alignment
 
     # Apply spacing
     if "space_before" in para_data:
@@ -134,9 +140,10 @@ def apply_font_properties(run, para_data: Dict[str, Any]):
     elif "theme_color" in para_data:
         # Get theme color by name (e.g., "DARK_1", "ACCENT_1")
         theme_name = para_data["theme_color"]
-        try:
-            run.font.color.theme_color = getattr(MSO_THEME_COLOR, theme_name)
-        except AttributeError:
+        theme_color = THEME_COLORS.get(theme_name)
+        if theme_color is not None:
+            run.font.color.theme_color = theme_color
+        else:
             print(f"  WARNING: Unknown theme color name '{theme_name}'")
 
 
@@ -176,38 +183,99 @@ def validate_replacements(inventory: InventoryData, replacements: Dict) -> List[
             continue
 
         # Check each shape
+        unused_summary = None
         for shape_key in shapes_data.keys():
             if shape_key not in inventory[slide_key]:
-                # Find shapes without replacements defined and show their content
-                unused_with_content = []
-                for k in inventory[slide_key].keys():
-                    if k not in shapes_data:
-                        shape_data = inventory[slide_key][k]
-                        # Get text from paragraphs as preview
-                        paragraphs = shape_data.paragraphs
-                        if paragraphs and paragraphs[0].text:
-                            first_text = paragraphs[0].text[:50]
-                            if len(paragraphs[0].text) > 50:
-                                first_text += "..."
-                            unused_with_content.append(f"{k} ('{first_text}')")
-                        else:
-                            unused_with_content.append(k)
+                # Find shapes without replacements defined and show their content.
+                # This is the same for every missing shape on the slide, so build it once.
+                if unused_summary is None:
+                    unused_with_content = []
+                    for k, shape_data in inventory[slide_key].items():
+                        if k not in shapes_data:
+                            # Get text from paragraphs as preview
+                            paragraphs = shape_data.paragraphs
+                            if paragraphs and paragraphs[0].text:
+                                first_text = paragraphs[0].text[:50]
+                                if len(paragraphs[0].text) > 50:
+                                    first_text += "..."
+                                unused_with_content.append(f"{k} ('{first_text}')")
+                            else:
+                                unused_with_content.append(k)
+                    unused_summary = (
+                        ", ".join(sorted(unused_with_content))
+                        if unused_with_content
+                        else "none"
+                    )
 
                 errors.append(
                     f"Shape '{shape_key}' not found on '{slide_key}'. "
-                    f"Shapes without replacements: {', '.join(sorted(unused_with_content)) if unused_with_content else 'none'}"
+                    f"Shapes without replacements: {unused_summary}"
                 )
 
     return errors
 
 
+def apply_slide_replacements(
+    shapes_dict: Dict[str, Any], slide_replacements: Dict
+) -> Tuple[int, int, int]:
+    """Clear and refill the text shapes of one slide.
+
+    Only touches the text frames of the given shapes, so each slide is an
+    independent unit of work. Slides are still processed one at a time:
+    python-pptx creates elements through a single module-level lxml parser,
+    which must not be used from several threads at once.
+
+    Returns (shapes_processed, shapes_cleared, shapes_replaced) for the slide.
+    """
+    shapes_processed = 0
+    shapes_cleared = 0
+    shapes_replaced = 0
+
+    # Process each shape from inventory
+    for shape_key, shape_data in shapes_dict.items():
+        shapes_processed += 1
+
+        # Get the shape directly from ShapeData
+        shape = shape_data.shape
+        if not shape:
+            print(f"Warning: {shape_key} has no shape reference")
+            continue
+
+        # ShapeData already validates text_frame in __init__
+        text_frame = shape.text_frame  # type: ignore
+
+        text_frame.clear()  # type: ignore
+        shapes_cleared += 1
+
+        # Check for replacement paragraphs
+        replacement_shape_data = slide_replacements.get(shape_key, {})
+        if "paragraphs" not in replacement_shape_data:
+            continue
+
+        shapes_replaced += 1
+
+        # Add replacement paragraphs
+        for i, para_data in enumerate(replacement_shape_data["paragraphs"]):
+            if i == 0:
+                p = text_frame.paragraphs[0]  # type: ignore
+            else:
+                p = text_frame.add_paragraph()  # type: ignore
+
+            apply_paragraph_properties(p, para_data)
+
+    return shapes_processed, shapes_cleared, shapes_replaced
+
+
 def check_duplicate_keys(pairs):
     """Check for duplicate keys when loading JSON."""
-    result = {}
-    for key, value in pairs:
-        if key in result:
-            raise ValueError(f"Duplicate key found in JSON: '{key}'")
-        result[key] = value
+    # Build the dict in C; only walk the pairs in Python when a key repeats
+    result = dict(pairs)
+    if len(result) != len(pairs):
+        seen = set()
+        for key, _ in pairs:
+            if key in seen:
+                raise ValueError(f"Duplicate key found in JSON: '{key}'")
+            seen.add(key)
     return result
 
 
@@ -245,6 +313,10 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
     shapes_cleared = 0
     shapes_replaced = 0
 
+    # len(prs.slides) re-counts the <p:sldIdLst> children on every call, so look the
+    # slide count up once
+    slide_count = len(prs.slides)
+
     # Process each slide from inventory
     for slide_key, shapes_dict in inventory.items():
         if not slide_key.startswith("slide-"):
@@ -252,56 +324,26 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
 
         slide_index = int(slide_key.split("-")[1])
 
-        if slide_index >= len(prs.slides):
+        if slide_index >= slide_count:
             print(f"Warning: Slide {slide_index} not found")
             continue
 
-        # Process each shape from inventory
-        for shape_key, shape_data in shapes_dict.items():
-            shapes_processed += 1
-
-            # Get the shape directly from ShapeData
-            shape = shape_data.shape
-            if not shape:
-                print(f"Warning: {shape_key} has no shape reference")
-                continue
-
-            # ShapeData already validates text_frame in __init__
-            text_frame = shape.text_frame  # type: ignore
-
-            text_frame.clear()  # type: ignore
-            shapes_cleared += 1
-
-            # Check for replacement paragraphs
-            replacement_shape_data = replacements.get(slide_key, {}).get(shape_key, {})
-            if "paragraphs" not in replacement_shape_data:
-                continue
-
-            shapes_replaced += 1
-
-            # Add replacement paragraphs
-            for i, para_data in enumerate(replacement_shape_data["paragraphs"]):
-                if i == 0:
-                    p = text_frame.paragraphs[0]  # type: ignore
-                else:
-                    p = text_frame.add_paragraph()  # type: ignore
-
-                apply_paragraph_properties(p, para_data)
+        processed, cleared, replaced = apply_slide_replacements(
+            shapes_dict, replacements.get(slide_key, {})
+        )
+        shapes_processed += processed
+        shapes_cleared += cleared
+        shapes_replaced += replaced
 
     # Check for issues after replacements
-    # Save to a temporary file and reload to avoid modifying the presentation during inventory
-    # (extract_text_inventory accesses font.color which adds empty <a:solidFill/> elements)
-    import tempfile
-
-    with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as tmp:
-        tmp_path = Path(tmp.name)
-        prs.save(str(tmp_path))
-
-    try:
-        updated_inventory = extract_text_inventory(tmp_path)
-        updated_overflow = detect_frame_overflow(updated_inventory)
-    finally:
-        tmp_path.unlink()  # Clean up temp file
+    # Serialize once in memory and inventory a reloaded copy to avoid modifying the
+    # presentation during inventory (extract_text_inventory accesses font.color which
+    # adds empty <a:solidFill/> elements). The same bytes are written as the output.
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    buffer.seek(0)
+    updated_inventory = extract_text_inventory(Path(pptx_file), Presentation(buffer))
+    updated_overflow = detect_frame_overflow(updated_inventory)
 
     # Check if any text overflow got worse
     overflow_errors = []
@@ -343,11 +385,12 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
         )
 
     # Save the presentation
-    prs.save(output_file)
+    with open(output_file, "wb") as f:
+        f.write(buffer.getvalue())
 
     # Report results
     print(f"Saved updated presentation to: {output_file}")
-    print(f"Processed {len(prs.slides)} slides")
+    print(f"Processed {slide_count} slides")
     print(f"  - Shapes processed: {shapes_processed}")
     print(f"  - Shapes cleared: {shapes_cleared}")
     print(f"  - Shapes replaced: {shapes_replaced}")
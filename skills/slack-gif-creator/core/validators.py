@@ -7,6 +7,8 @@ These validators help ensure your GIFs meet Slack's size and dimension constrain
 
 from pathlib import Path
 
+from PIL import Image
+
 
 def validate_gif(
     gif_path: str | Path, is_emoji: bool = True, verbose: bool = True
@@ -22,8 +24,6 @@ def validate_gif(
     Returns:
         Tuple of (passes: bool, results: dict with all details)
     """
-    from PIL import Image
-
     gif_path = Path(gif_path)
 
     if not gif_path.exists():
@@ -39,14 +39,9 @@ def validate_gif(
         with Image.open(gif_path) as img:
             width, height = img.size
 
-            # Count frames
-            frame_count = 0
-            try:
-                while True:
-                    img.seek(frame_count)
-                    frame_count += 1
-            except EOFError:
-                pass
+            # Count frames (Pillow walks the frame headers without decoding
+            # the image data; single-frame formats have no n_frames)
+            frame_count = getattr(img, "n_frames", 1)
 
             # Get duration
             try: